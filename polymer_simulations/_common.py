@@ -0,0 +1,77 @@
+"""
+Shared setup for the polymer simulation cases
+Builds the minimization, equilibration and production configs used by Case A and Case B
+"""
+from calvados.cfg import Config
+
+def build_phase_configs(sysname, L, equil_steps=100000, total_steps=int(100 * 1e6), N_save=1000):
+    """
+    Build the configs for the three simulation phases of a case
+
+    Parameters:
+    -----------
+    sysname : str
+        System name; the phases are named sysname_min, sysname_eq and sysname_prod
+    L : float
+        Side length of the cubic box in nm
+    equil_steps : int
+        Number of equilibration steps
+    total_steps : int
+        Number of production steps
+    N_save : int
+        Saving interval in steps for equilibration and production
+
+    Returns:
+    --------
+    configs : dict
+        Config objects keyed by phase: 'min', 'eq' and 'prod'
+    """
+    # Settings shared by all phases
+    general = dict(
+        box = [L, L, L],  # nm
+        temp = 293.15,  # K
+        ionic = 0.15,  # M
+        pH = 7.0,
+        platform = 'CPU',
+        verbose = True,
+    )
+
+    # MINIMIZATION CONFIG
+    config_min = Config(
+        sysname = sysname + '_min',
+        **general,
+
+        # MINIMIZATION SETTINGS
+        minimize = True,
+        minimize_steps = 1000,
+
+        # RUNTIME SETTINGS
+        wfreq = 100,
+        steps = 100,  # minimal steps after minimization
+    )
+
+    # EQUILIBRATION CONFIG
+    config_eq = Config(
+        sysname = sysname + '_eq',
+        **general,
+
+        # RUNTIME SETTINGS
+        wfreq = N_save,
+        steps = equil_steps,  # 1 ns equilibration
+        restart = 'checkpoint',
+        frestart = 'restart.chk',
+    )
+
+    # PRODUCTION CONFIG
+    config_prod = Config(
+        sysname = sysname + '_prod',
+        **general,
+
+        # RUNTIME SETTINGS
+        wfreq = N_save,  # save every 10 ps
+        steps = total_steps,  # 100 ns production
+        restart = 'checkpoint',
+        frestart = 'restart.chk',
+    )
+
+    return {'min': config_min, 'eq': config_eq, 'prod': config_prod}
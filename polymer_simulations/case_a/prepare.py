@@ -7,10 +7,12 @@ import os
 import sys
 import subprocess
 
-# Add parent directory to path to import calvados
+# Add parent directories to path to import calvados and the shared setup
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from calvados.cfg import Config, Components
+from calvados.cfg import Components
+from _common import build_phase_configs
 
 # Get current working directory
 cwd = os.path.dirname(os.path.abspath(__file__))
@@ -37,61 +39,9 @@ equil_steps = 100000
 
 residues_file = os.path.join(input_dir, 'polymer_residues.csv')
 
-# MINIMIZATION CONFIG
-config_min = Config(
-    # GENERAL
-    sysname = sysname + '_min',
-    box = [L, L, L],  # nm
-    temp = 293.15,  # K
-    ionic = 0.15,  # M
-    pH = 7.0,
-    
-    # MINIMIZATION SETTINGS
-    minimize = True,
-    minimize_steps = 1000,
-    
-    # RUNTIME SETTINGS
-    wfreq = 100,
-    steps = 100,  # minimal steps after minimization
-    platform = 'CPU',
-    verbose = True,
-)
-
-# EQUILIBRATION CONFIG
-config_eq = Config(
-    # GENERAL
-    sysname = sysname + '_eq',
-    box = [L, L, L],  # nm
-    temp = 293.15,  # K
-    ionic = 0.15,  # M
-    pH = 7.0,
-    
-    # RUNTIME SETTINGS
-    wfreq = N_save,
-    steps = equil_steps,  # 1 ns equilibration
-    platform = 'CPU',
-    restart = 'checkpoint',
-    frestart = 'restart.chk',
-    verbose = True,
-)
-
-# PRODUCTION CONFIG
-config_prod = Config(
-    # GENERAL
-    sysname = sysname + '_prod',
-    box = [L, L, L],  # nm
-    temp = 293.15,  # K
-    ionic = 0.15,  # M
-    pH = 7.0,
-    
-    # RUNTIME SETTINGS
-    wfreq = N_save,  # save every 10 ps
-    steps = total_steps,  # 100 ns production
-    platform = 'CPU',
-    restart = 'checkpoint',
-    frestart = 'restart.chk',
-    verbose = True,
-)
+# Minimization, equilibration and production configs
+configs = build_phase_configs(sysname, L, equil_steps=equil_steps,
+                              total_steps=total_steps, N_save=N_save)
 
 # Create output directories
 path_min = os.path.join(cwd, 'minimization')
@@ -102,9 +52,9 @@ for path in [path_min, path_eq, path_prod]:
     os.makedirs(path, exist_ok=True)
 
 # Write config files
-config_min.write(path_min, name='config.yaml')
-config_eq.write(path_eq, name='config.yaml')
-config_prod.write(path_prod, name='config.yaml')
+configs['min'].write(path_min, name='config.yaml')
+configs['eq'].write(path_eq, name='config.yaml')
+configs['prod'].write(path_prod, name='config.yaml')
 
 # Define components - polyallylamine chains
 # Create 10 chains of 50 monomers each for reasonable density
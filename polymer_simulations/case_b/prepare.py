@@ -6,11 +6,14 @@ Simulates a 5 nm cubic box with mixed polymer chains
 import os
 import sys
 import subprocess
+from pathlib import Path
 
-# Add parent directory to path to import calvados
+# Add parent directories to path to import calvados and the shared setup
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from calvados.cfg import Config, Components
+from calvados.cfg import Components
+from _common import build_phase_configs
 
 # Get current working directory
 cwd = os.path.dirname(os.path.abspath(__file__))
@@ -36,61 +39,9 @@ equil_steps = 100000
 
 residues_file = os.path.join(input_dir, 'polymer_residues.csv')
 
-# MINIMIZATION CONFIG
-config_min = Config(
-    # GENERAL
-    sysname = sysname + '_min',
-    box = [L, L, L],  # nm
-    temp = 293.15,  # K
-    ionic = 0.15,  # M
-    pH = 7.0,
-    
-    # MINIMIZATION SETTINGS
-    minimize = True,
-    minimize_steps = 1000,
-    
-    # RUNTIME SETTINGS
-    wfreq = 100,
-    steps = 100,  # minimal steps after minimization
-    platform = 'CPU',
-    verbose = True,
-)
-
-# EQUILIBRATION CONFIG
-config_eq = Config(
-    # GENERAL
-    sysname = sysname + '_eq',
-    box = [L, L, L],  # nm
-    temp = 293.15,  # K
-    ionic = 0.15,  # M
-    pH = 7.0,
-    
-    # RUNTIME SETTINGS
-    wfreq = N_save,
-    steps = equil_steps,  # 1 ns equilibration
-    platform = 'CPU',
-    restart = 'checkpoint',
-    frestart = 'restart.chk',
-    verbose = True,
-)
-
-# PRODUCTION CONFIG
-config_prod = Config(
-    # GENERAL
-    sysname = sysname + '_prod',
-    box = [L, L, L],  # nm
-    temp = 293.15,  # K
-    ionic = 0.15,  # M
-    pH = 7.0,
-    
-    # RUNTIME SETTINGS
-    wfreq = N_save,  # save every 10 ps
-    steps = total_steps,  # 100 ns production
-    platform = 'CPU',
-    restart = 'checkpoint',
-    frestart = 'restart.chk',
-    verbose = True,
-)
+# Minimization, equilibration and production configs
+configs = build_phase_configs(sysname, L, equil_steps=equil_steps,
+                              total_steps=total_steps, N_save=N_save)
 
 # Create output directories
 path_min = os.path.join(cwd, 'minimization')
@@ -101,9 +52,9 @@ for path in [path_min, path_eq, path_prod]:
     os.makedirs(path, exist_ok=True)
 
 # Write config files
-config_min.write(path_min, name='config.yaml')
-config_eq.write(path_eq, name='config.yaml')
-config_prod.write(path_prod, name='config.yaml')
+configs['min'].write(path_min, name='config.yaml')
+configs['eq'].write(path_eq, name='config.yaml')
+configs['prod'].write(path_prod, name='config.yaml')
 
 # Define components - 50% polyallylamine, 50% glutaraldehyde
 # 5 chains of each type
@@ -154,10 +105,17 @@ combined_components['system']['polyallylamine_chain']['nmol'] = 5
 combined_components['system']['glutaraldehyde_chain']['nmol'] = 5
 
 # Write combined components to all directories
+# (libyaml C dumper when PyYAML was built with it)
 import yaml
+try:
+    from yaml import CSafeDumper as Dumper
+except ImportError:
+    from yaml import SafeDumper as Dumper
+
+# Serialize once; the three phases use identical components
+buf = yaml.dump(combined_components, Dumper=Dumper, sort_keys=False).encode()
 for path in [path_min, path_eq, path_prod]:
-    with open(os.path.join(path, 'components.yaml'), 'w') as f:
-        yaml.dump(combined_components, f, sort_keys=False)
+    Path(path, 'components.yaml').write_bytes(buf)
 
 print(f"Setup complete for Case B: 50% Polyallylamine + 50% Glutaraldehyde")
 print(f"Box size: {L} nm")
@@ -5,17 +5,20 @@ Runs both Case A and Case B simulations with minimization, equilibration, and pr
 """
 import os
 import sys
+import json
+import shlex
 import subprocess
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 
-def run_command(cmd, description):
-    """Run a command and handle errors"""
+def run_command(argv, description, cwd=None):
+    """Run a command (argv list, no shell) and handle errors"""
     print(f"\n{'='*60}")
     print(f"{description}")
     print(f"{'='*60}")
-    print(f"Running: {cmd}")
+    print(f"Running: {shlex.join(argv)}" + (f" (in {cwd})" if cwd else ""))
     
-    result = subprocess.run(cmd, shell=True)
+    result = subprocess.run(argv, cwd=cwd, shell=False, check=False)
     
     if result.returncode != 0:
         print(f"Error: Command failed with return code {result.returncode}")
@@ -29,8 +32,8 @@ def setup_case(case_dir):
         print(f"Error: prepare.py not found in {case_dir}")
         return False
     
-    cmd = f"cd {case_dir} && python prepare.py"
-    return run_command(cmd, f"Setting up {os.path.basename(case_dir)}")
+    argv = [sys.executable, prepare_script]
+    return run_command(argv, f"Setting up {os.path.basename(case_dir)}", cwd=case_dir)
 
 def run_simulation(sim_dir, phase_name):
     """Run a single simulation phase"""
@@ -39,8 +42,8 @@ def run_simulation(sim_dir, phase_name):
         print(f"Error: run.py not found in {sim_dir}")
         return False
     
-    cmd = f"cd {sim_dir} && python run.py --path ."
-    return run_command(cmd, f"Running {phase_name} in {os.path.basename(os.path.dirname(sim_dir))}")
+    argv = [sys.executable, run_script, '--path', sim_dir]
+    return run_command(argv, f"Running {phase_name} in {os.path.basename(os.path.dirname(sim_dir))}", cwd=sim_dir)
 
 def run_case_simulations(case_dir, skip_minimization=False, skip_equilibration=False, skip_production=False):
     """Run all simulation phases for a case"""
@@ -74,16 +77,17 @@ def run_case_simulations(case_dir, skip_minimization=False, skip_equilibration=F
     print(f"\n✓ Completed all simulations for {case_name}")
     return True
 
-def analyze_crosslinking(case_b_dir):
-    """Run crosslinking analysis for Case B"""
-    print(f"\n{'#'*60}")
-    print(f"# ANALYZING CROSSLINKING (CASE B)")
-    print(f"{'#'*60}\n")
+def find_trajectory_files(prod_dir):
+    """Find the trajectory (.dcd) and topology (.pdb) in prod_dir, caching the result in .paths.json"""
+    cache_file = os.path.join(prod_dir, '.paths.json')
     
-    prod_dir = os.path.join(case_b_dir, 'production')
-    analysis_script = os.path.join(os.path.dirname(case_b_dir), 'analysis', 'analyze_crosslinking.py')
+    # Reuse the previous scan while the files it found still exist
+    if os.path.exists(cache_file):
+        with open(cache_file) as f:
+            paths = json.load(f)
+        if all(paths.get(key) and os.path.exists(paths[key]) for key in ['traj', 'top']):
+            return paths['traj'], paths['top']
     
-    # Find trajectory and topology files
     traj_file = None
     top_file = None
     
@@ -93,15 +97,33 @@ def analyze_crosslinking(case_b_dir):
         elif f.endswith('.pdb'):
             top_file = os.path.join(prod_dir, f)
     
+    if traj_file and top_file:
+        with open(cache_file, 'w') as f:
+            json.dump({'traj': traj_file, 'top': top_file}, f)
+    
+    return traj_file, top_file
+
+def analyze_crosslinking(case_b_dir):
+    """Run crosslinking analysis for Case B"""
+    print(f"\n{'#'*60}")
+    print(f"# ANALYZING CROSSLINKING (CASE B)")
+    print(f"{'#'*60}\n")
+    
+    prod_dir = os.path.join(case_b_dir, 'production')
+    analysis_script = os.path.join(os.path.dirname(case_b_dir), 'analysis', 'analyze_crosslinking.py')
+    
+    # Find trajectory and topology files
+    traj_file, top_file = find_trajectory_files(prod_dir)
+    
     if not traj_file or not top_file:
         print("Warning: Could not find trajectory (.dcd) or topology (.pdb) files")
         print("Skipping crosslinking analysis")
         return False
     
     output_prefix = os.path.join(prod_dir, 'crosslinking_analysis')
-    cmd = f"python {analysis_script} --traj {traj_file} --top {top_file} --output {output_prefix}"
+    argv = [sys.executable, analysis_script, '--traj', traj_file, '--top', top_file, '--output', output_prefix]
     
-    return run_command(cmd, "Analyzing crosslinking extent")
+    return run_command(argv, "Analyzing crosslinking extent")
 
 def main():
     parser = argparse.ArgumentParser(description='Run polymer simulations')
@@ -117,6 +139,8 @@ def main():
                        help='Only run crosslinking analysis (requires completed Case B simulation)')
     parser.add_argument('--setup-only', action='store_true',
                        help='Only run setup scripts, do not run simulations')
+    parser.add_argument('--parallel-cases', action='store_true',
+                       help='With --case both, run the Case A and Case B simulations concurrently')
     
     args = parser.parse_args()
     
@@ -150,21 +174,23 @@ def main():
         return
     
     # Run simulations
-    success = True
-    
+    case_dirs = []
     if args.case in ['a', 'both']:
-        if not run_case_simulations(case_a_dir, 
-                                   args.skip_minimization, 
-                                   args.skip_equilibration, 
-                                   args.skip_production):
-            success = False
-    
+        case_dirs.append(case_a_dir)
     if args.case in ['b', 'both']:
-        if not run_case_simulations(case_b_dir,
-                                   args.skip_minimization,
-                                   args.skip_equilibration,
-                                   args.skip_production):
-            success = False
+        case_dirs.append(case_b_dir)
+    skips = [args.skip_minimization, args.skip_equilibration, args.skip_production]
+    
+    if args.parallel_cases and len(case_dirs) > 1:
+        # The cases share no data, so their pipelines can run side by side
+        print(f"\nRunning {len(case_dirs)} cases in parallel")
+        with ProcessPoolExecutor(max_workers=len(case_dirs)) as executor:
+            results = list(executor.map(run_case_simulations, case_dirs,
+                                        *[[skip] * len(case_dirs) for skip in skips]))
+    else:
+        results = [run_case_simulations(case_dir, *skips) for case_dir in case_dirs]
+    
+    success = all(results)
     
     # Analyze crosslinking for Case B
     if args.case in ['b', 'both'] and not args.skip_production:
@@ -0,0 +1,120 @@
+import os
+import sys
+import shutil
+import pytest
+import numpy as np
+
+mda = pytest.importorskip('MDAnalysis')
+pytest.importorskip('matplotlib')
+from MDAnalysis.coordinates.memory import MemoryReader
+from MDAnalysis.lib.distances import distance_array
+
+# analyze_crosslinking.py is a script, not part of the calvados package; keep
+# its directory on sys.path so spawned --nproc workers can import it too
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'polymer_simulations', 'analysis'))
+import analyze_crosslinking as ac
+
+# Coordinates lie on a 0.25 A lattice, so squared distances are multiples of
+# 0.0625 A^2 and never fall close to the squared cutoff (6.1 A)^2 = 37.21 A^2:
+# float32 and float64 kernels, '<' and '<=' all have to agree exactly
+CUTOFF = 0.61 # nm
+L = 50.0 # A
+
+def make_universe(n_frames=7, n_per_group=40, seed=0):
+    """ Two residues, PAA and GTA, in a cubic box of side L """
+    n_atoms = 2 * n_per_group
+    u = mda.Universe.empty(n_atoms, n_residues=2, atom_resindex=np.repeat([0, 1], n_per_group),
+                           trajectory=False)
+    u.add_TopologyAttr('names', ['CA'] * n_atoms)
+    u.add_TopologyAttr('resnames', ['PAA', 'GTA'])
+    u.add_TopologyAttr('resids', [1, 2])
+    rng = np.random.default_rng(seed)
+    coords = (rng.integers(0, 200, size=(n_frames, n_atoms, 3)) * 0.25).astype(np.float32)
+    u.load_new(coords, format=MemoryReader, dimensions=np.array([L, L, L, 90, 90, 90], dtype=np.float32))
+    return u
+
+def write_system(u, path):
+    """ Write PDB topology and DCD trajectory of u to path """
+    top = str(path / 'top.pdb')
+    traj = str(path / 'traj.dcd')
+    u.atoms.write(top)
+    with mda.Writer(traj, u.atoms.n_atoms) as W:
+        for ts in u.trajectory:
+            W.write(u.atoms)
+    return traj, top
+
+def reference_contacts(u, stride=1):
+    """ Contacts per frame from the full MDAnalysis distance matrix """
+    paa_atoms = u.select_atoms('resname PAA')
+    gta_atoms = u.select_atoms('resname GTA')
+    return np.array([
+        np.count_nonzero(distance_array(paa_atoms.positions, gta_atoms.positions, box=ts.dimensions) < CUTOFF * 10)
+        for ts in u.trajectory[::stride]
+    ])
+
+@pytest.mark.parametrize("stride", [1, 3])
+@pytest.mark.parametrize("dense", [False, True])
+@pytest.mark.parametrize("method", ['kernel', 'kernel-aot', 'nsgrid', 'bruteforce'])
+def test_count_contacts_block(method, dense, stride):
+    if method == 'kernel':
+        pytest.importorskip('numba')
+    if method == 'kernel-aot' and not ac.HAS_AOT:
+        pytest.skip('_contacts_aot is not built')
+
+    u = make_universe()
+    paa_atoms, gta_atoms = ac.select_polymer_groups(u)
+    contacts = ac.count_contacts_block(u, paa_atoms, gta_atoms, None, None, CUTOFF * 10, method,
+                                       backend='serial', stride=stride, dense=dense)
+
+    assert np.array_equal(contacts, reference_contacts(u, stride))
+
+def test_numpy_kernel():
+    u = make_universe()
+    paa_atoms, gta_atoms = ac.select_polymer_groups(u)
+    rc = np.float32(CUTOFF * 10)
+    box = np.full(3, L, dtype=np.float32)
+
+    contacts = [ac.count_contacts_ortho_numpy(paa_atoms.positions, gta_atoms.positions,
+                                              box, np.float32(1.0) / box, rc * rc)
+                for ts in u.trajectory]
+
+    assert np.array_equal(contacts, reference_contacts(u))
+
+@pytest.mark.parametrize("stride", [1, 2])
+@pytest.mark.parametrize("nproc", [1, 2])
+@pytest.mark.parametrize("reader", ['mdanalysis', 'mdtraj'])
+def test_calculate_contacts(tmp_path, reader, nproc, stride):
+    pytest.importorskip('numba')
+    if reader == 'mdtraj':
+        pytest.importorskip('mdtraj')
+
+    traj, top = write_system(make_universe(), tmp_path)
+    reference = reference_contacts(mda.Universe(top, traj), stride)
+
+    contact_data = ac.calculate_contacts(traj, top, CUTOFF, method='auto', nproc=nproc,
+                                         stride=stride, reader=reader)
+
+    assert np.array_equal(contact_data['contacts_per_frame'], reference)
+    assert contact_data['n_frames'] == len(reference)
+    assert contact_data['stride'] == stride
+    assert contact_data['max_frame_contacts'] == reference.max()
+
+def test_contact_cache(tmp_path):
+    traj, top = write_system(make_universe(), tmp_path)
+    cache_dir = str(tmp_path / 'cache')
+
+    computed = ac.calculate_contacts(traj, top, CUTOFF, method='nsgrid', cache_dir=cache_dir)
+    cache_file = ac.contact_cache_file(cache_dir, traj, top, CUTOFF)
+    assert os.path.exists(cache_file)
+
+    cached = ac.calculate_contacts(traj, top, CUTOFF, method='nsgrid', cache_dir=cache_dir)
+    assert cached.keys() == computed.keys()
+    assert np.array_equal(cached['contacts_per_frame'], computed['contacts_per_frame'])
+    assert cached['n_paa_atoms'] == computed['n_paa_atoms']
+
+    # A different topology, cutoff or stride must not hit the same cache file
+    top2 = str(tmp_path / 'top2.pdb')
+    shutil.copyfile(top, top2)
+    assert ac.contact_cache_file(cache_dir, traj, top2, CUTOFF) != cache_file
+    assert ac.contact_cache_file(cache_dir, traj, top, CUTOFF + 0.1) != cache_file
+    assert ac.contact_cache_file(cache_dir, traj, top, CUTOFF, stride=2) != cache_file